@@ -1,13 +1,30 @@
 """Configuration module for loading settings from environment variables."""
 
 import os
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 import yaml
 from dotenv import load_dotenv
 
-load_dotenv()
+
+def load_env_file() -> bool:
+    """Load .env into the environment unless APP_ENV is "production".
+
+    Production deployments export real environment variables, so parsing .env
+    there is wasted work.
+
+    Returns:
+        True if a .env file was loaded.
+    """
+    if os.getenv("APP_ENV") == "production":
+        return False
+    return load_dotenv()
+
+
+load_env_file()
 
 # Path to tokens.yaml, relative to this file
 TOKENS_YAML_PATH = Path(__file__).parent / "tokens.yaml"
@@ -90,34 +107,59 @@ def get_token_by_id(token_id: str, network: str) -> dict[str, Any] | None:
     }
 
 
+def _env(key: str, default: str) -> Callable[[], str]:
+    """Build a dataclass default factory reading a string environment variable."""
+    return lambda: os.getenv(key, default)
+
+
+def _env_int(key: str, default: str) -> Callable[[], int]:
+    """Build a dataclass default factory reading an integer environment variable."""
+    return lambda: int(os.getenv(key, default))
+
+
+def _env_bool(key: str, default: str) -> Callable[[], bool]:
+    """Build a dataclass default factory reading a boolean environment variable."""
+    return lambda: os.getenv(key, default).lower() in ("1", "true", "yes")
+
+
+@dataclass(frozen=True, slots=True)
 class Settings:
-    """Application settings loaded from environment variables."""
-
-    def __init__(self) -> None:
-        """Initialize settings from environment variables."""
-        # Application settings
-        self.app_name: str = os.getenv("APP_NAME", "Payment Link Service")
-        self.app_logo: str = os.getenv("APP_LOGO", "/static/logo.png")
-        self.app_host: str = os.getenv("APP_HOST", "0.0.0.0")
-        self.app_port: int = int(os.getenv("APP_PORT", "8000"))
-        self.app_base_url: str = os.getenv("APP_BASE_URL", "http://localhost:8000")
-
-        # x402 Payment settings
-        # Valid networks: base-sepolia (testnet), base (mainnet)
-        self.network: str = os.getenv("NETWORK", "base-sepolia")
-        self.facilitator_url: str = os.getenv(
-            "FACILITATOR_URL", "https://x402f1.secondstate.io"
-        )
-        self.max_timeout_seconds: int = int(os.getenv("MAX_TIMEOUT_SECONDS", "60"))
-
-        # Chain settings
-        self.chain_id: int = int(os.getenv("CHAIN_ID", "84532"))
-        self.explorer_url: str = os.getenv(
-            "EXPLORER_URL", "https://sepolia.basescan.org/tx/"
-        )
-
-        # Database settings
-        self.database_path: str = os.getenv("DATABASE_PATH", "payments.db")
+    """Application settings loaded once from environment variables."""
+
+    # Application settings
+    app_name: str = field(default_factory=_env("APP_NAME", "Payment Link Service"))
+    app_logo: str = field(default_factory=_env("APP_LOGO", "/static/logo.png"))
+    app_host: str = field(default_factory=_env("APP_HOST", "0.0.0.0"))
+    app_port: int = field(default_factory=_env_int("APP_PORT", "8000"))
+    app_base_url: str = field(
+        default_factory=_env("APP_BASE_URL", "http://localhost:8000")
+    )
+    # Server processes when started with `python main.py` outside debug mode
+    app_workers: int = field(
+        default_factory=_env_int("APP_WORKERS", str(os.cpu_count() or 1))
+    )
+    # Include tracebacks in 500 responses and auto-reload; never enable in production
+    debug: bool = field(default_factory=_env_bool("DEBUG", "false"))
+
+    # x402 Payment settings
+    # Valid networks: base-sepolia (testnet), base (mainnet)
+    network: str = field(default_factory=_env("NETWORK", "base-sepolia"))
+    facilitator_url: str = field(
+        default_factory=_env("FACILITATOR_URL", "https://x402f1.secondstate.io")
+    )
+    max_timeout_seconds: int = field(
+        default_factory=_env_int("MAX_TIMEOUT_SECONDS", "60")
+    )
+
+    # Chain settings
+    chain_id: int = field(default_factory=_env_int("CHAIN_ID", "84532"))
+    explorer_url: str = field(
+        default_factory=_env("EXPLORER_URL", "https://sepolia.basescan.org/tx/")
+    )
+
+    # Database settings
+    database_path: str = field(default_factory=_env("DATABASE_PATH", "payments.db"))
+    database_pool_size: int = field(default_factory=_env_int("DATABASE_POOL_SIZE", "4"))
 
 
 settings = Settings()
@@ -1,103 +1,404 @@
 """Database module for payment tracking using SQLite."""
 
+import asyncio
+import functools
+import logging
+import time
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from typing import NamedTuple
+from urllib.parse import quote
+
 import aiosqlite
 
-from config import settings
-
-
-async def init_db() -> None:
-    """Initialize the database and create tables if they don't exist."""
-    async with aiosqlite.connect(settings.database_path) as db:
-        await db.execute("""
-            CREATE TABLE IF NOT EXISTS payments (
-                payment_id TEXT PRIMARY KEY,
-                amount REAL NOT NULL,
-                receiver TEXT NOT NULL,
-                token_id TEXT NOT NULL DEFAULT 'usdc',
-                status TEXT NOT NULL DEFAULT 'pending',
-                tx_hash TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        # Migration: add token_id column if missing (for existing databases)
-        cursor = await db.execute("PRAGMA table_info(payments)")
-        columns = [row[1] for row in await cursor.fetchall()]
-        if "token_id" not in columns:
-            await db.execute(
-                "ALTER TABLE payments ADD COLUMN token_id TEXT NOT NULL DEFAULT 'usdc'"
-            )
+logger = logging.getLogger(__name__)
+
+# Per-connection tuning applied to every connection we open
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+)
+
+# Compiled statements are cached per connection, keyed by the exact SQL text,
+# so hot queries live in constants and are reused for the connection lifetime
+STATEMENT_CACHE_SIZE = 128
+
+# How long a writer waits for another process's write lock, e.g. while the
+# first worker to start migrates an old database
+BUSY_TIMEOUT_SECONDS = 30.0
+
+# payment_id is the only lookup key, so the rows live directly in the primary
+# key B-tree instead of behind a separate rowid index
+PAYMENTS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        payment_id TEXT PRIMARY KEY,
+        amount REAL NOT NULL,
+        receiver TEXT NOT NULL,
+        token_id TEXT NOT NULL DEFAULT 'usdc',
+        status TEXT NOT NULL DEFAULT 'pending',
+        tx_hash TEXT,
+        created_at INTEGER NOT NULL,
+        updated_at INTEGER NOT NULL
+    ) WITHOUT ROWID
+"""
+PAYMENTS_COLUMNS = (
+    "payment_id, amount, receiver, token_id, status, tx_hash, created_at, updated_at"
+)
+# Older tables stored CURRENT_TIMESTAMP strings; convert them to Unix seconds
+EPOCH_FROM_LEGACY_SQL = (
+    "CASE WHEN typeof({column}) = 'integer' THEN {column} "
+    "ELSE COALESCE(CAST(strftime('%s', {column}) AS INTEGER), "
+    "CAST(strftime('%s', 'now') AS INTEGER)) END"
+)
+
+INSERT_PAYMENT_SQL = (
+    "INSERT INTO payments "
+    "(payment_id, amount, receiver, token_id, status, created_at, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+PAYMENT_RECORD_COLUMNS = "payment_id, amount, receiver, token_id, status, tx_hash"
+SELECT_PAYMENT_SQL = (
+    f"SELECT {PAYMENT_RECORD_COLUMNS} FROM payments WHERE payment_id = ?"
+)
+# Largest number of IDs accepted by a single batched lookup
+MAX_BATCH_SIZE = 100
+
+
+@functools.lru_cache(maxsize=MAX_BATCH_SIZE)
+def select_payments_sql(count: int) -> str:
+    """Build the batched SELECT for a given number of payment IDs.
+
+    The SQL text only varies with the ID count, so each size reuses one cached
+    statement.
+
+    Args:
+        count: Number of payment IDs to look up.
+
+    Returns:
+        SELECT statement with one placeholder per payment ID.
+    """
+    placeholders = ", ".join("?" * count)
+    return (
+        f"SELECT {PAYMENT_RECORD_COLUMNS} FROM payments "
+        f"WHERE payment_id IN ({placeholders})"
+    )
+
+
+# Only a pending payment can become paid; RETURNING reports whether it did
+MARK_PAID_SQL = (
+    "UPDATE payments "
+    "SET status = 'paid', tx_hash = ?, updated_at = ? "
+    "WHERE payment_id = ? AND status = 'pending' "
+    "RETURNING tx_hash"
+)
+
+
+class PaymentRecord(NamedTuple):
+    """Payment fields read by the service, in PAYMENT_RECORD_COLUMNS order."""
+
+    payment_id: str
+    amount: float
+    receiver: str
+    token_id: str
+    status: str
+    tx_hash: str | None
+
+
+async def connect_db(
+    database_path: str, read_only: bool = False
+) -> aiosqlite.Connection:
+    """Open a long-lived database connection.
+
+    Args:
+        database_path: Path to the SQLite database file.
+        read_only: Open the file in read-only mode and reject writes.
+
+    Returns:
+        An open connection with tuned PRAGMAs.
+    """
+    if read_only:
+        uri = f"file:{quote(database_path)}?mode=ro"
+        db = await aiosqlite.connect(
+            uri, uri=True, cached_statements=STATEMENT_CACHE_SIZE
+        )
+        await db.execute("PRAGMA query_only=1")
+    else:
+        db = await aiosqlite.connect(
+            database_path,
+            timeout=BUSY_TIMEOUT_SECONDS,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+    for pragma in CONNECTION_PRAGMAS:
+        await db.execute(pragma)
+    return db
+
+
+class ConnectionPool:
+    """One read-write connection plus a fixed set of read-only connections.
+
+    SQLite allows a single writer at a time, so all writes share one connection
+    behind a lock while reads run in parallel on read-only WAL connections.
+    """
+
+    def __init__(self, database_path: str, readers: int = 4) -> None:
+        """Create an unopened pool.
+
+        Args:
+            database_path: Path to the SQLite database file.
+            readers: Number of read-only connections to open, at least one.
+        """
+        # acquire() would wait forever on a pool with no readers
+        if readers < 1:
+            raise ValueError(f"Connection pool needs at least 1 reader, got {readers}")
+        self.database_path = database_path
+        self.readers = readers
+        self._writer: aiosqlite.Connection | None = None
+        self._write_lock = asyncio.Lock()
+        self._idle_readers: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        self._all_readers: list[aiosqlite.Connection] = []
+
+    async def open(self) -> None:
+        """Open the writer, create the schema, then open the readers."""
+        self._writer = await connect_db(self.database_path)
+        # Readers open the file with mode=ro, so it must exist first
+        await init_db(self._writer)
+        for _ in range(self.readers):
+            reader = await connect_db(self.database_path, read_only=True)
+            self._all_readers.append(reader)
+            self._idle_readers.put_nowait(reader)
+
+    async def close(self) -> None:
+        """Close every connection in the pool."""
+        for reader in self._all_readers:
+            await reader.close()
+        self._all_readers.clear()
+        if self._writer is not None:
+            await self._writer.close()
+            self._writer = None
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read-only connection, waiting if all are in use."""
+        reader = await self._idle_readers.get()
+        try:
+            yield reader
+        finally:
+            self._idle_readers.put_nowait(reader)
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Hold the read-write connection exclusively for one write."""
+        if self._writer is None:
+            raise RuntimeError("Connection pool is not open")
+        async with self._write_lock:
+            yield self._writer
+
+
+async def init_db(db: aiosqlite.Connection) -> None:
+    """Initialize the database and create tables if they don't exist.
+
+    Switches the file to WAL mode, which persists in the database file, so readers
+    can run alongside the writer and commits need fewer fsyncs.
+
+    Args:
+        db: Open read-write database connection.
+    """
+    cursor = await db.execute("PRAGMA journal_mode=WAL")
+    row = await cursor.fetchone()
+    journal_mode = row[0] if row else None
+    if journal_mode != "wal":
+        logger.warning("SQLite WAL mode unavailable, using %s journal", journal_mode)
+    await db.execute(PAYMENTS_TABLE_SQL.format(table="payments"))
+    if not await _payments_schema_is_current(db):
+        async with write_transaction(db):
+            # Other workers may have migrated while this one waited for the lock
+            if not await _payments_schema_is_current(db):
+                await _migrate_payments_table(db)
+
+
+async def _payments_schema_is_current(db: aiosqlite.Connection) -> bool:
+    """Check whether the payments table already has the current schema.
+
+    Args:
+        db: Open database connection.
+    """
+    cursor = await db.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'payments'"
+    )
+    row = await cursor.fetchone()
+    cursor = await db.execute("PRAGMA table_info(payments)")
+    column_types = {column[1]: column[2].upper() for column in await cursor.fetchall()}
+    return (
+        row is not None
+        and "WITHOUT ROWID" in row[0].upper()
+        and "token_id" in column_types
+        and column_types.get("created_at") == "INTEGER"
+    )
+
+
+async def _migrate_payments_table(db: aiosqlite.Connection) -> None:
+    """Bring an older payments table up to the current schema.
+
+    Args:
+        db: Open read-write database connection inside a write transaction.
+    """
+    # Migration: add token_id column if missing (for existing databases)
+    cursor = await db.execute("PRAGMA table_info(payments)")
+    columns = [row[1] for row in await cursor.fetchall()]
+    if "token_id" not in columns:
+        await db.execute(
+            "ALTER TABLE payments ADD COLUMN token_id TEXT NOT NULL DEFAULT 'usdc'"
+        )
+    # Migration: rebuild tables created before WITHOUT ROWID and integer
+    # timestamps were used
+    await _rebuild_payments_table(db)
+
+
+@asynccontextmanager
+async def write_transaction(db: aiosqlite.Connection) -> AsyncIterator[None]:
+    """Run writes in one transaction that takes the write lock up front.
+
+    BEGIN IMMEDIATE avoids upgrading a read transaction to a write mid-way, and
+    the whole block costs a single commit.
+
+    Args:
+        db: Open read-write database connection.
+    """
+    try:
+        await db.execute("BEGIN IMMEDIATE")
+        yield
         await db.commit()
+    except BaseException:
+        # The connection thread runs queued calls in order, so this rollback
+        # also undoes a BEGIN sent just before the task was cancelled. Shield it
+        # so a second cancellation cannot skip it.
+        await asyncio.shield(db.rollback())
+        raise
+
+
+async def _rebuild_payments_table(db: aiosqlite.Connection) -> None:
+    """Copy payments into a table with the current schema and swap it in.
+
+    Args:
+        db: Open read-write database connection inside a write transaction.
+    """
+    await db.execute("DROP TABLE IF EXISTS payments_new")
+    await db.execute(PAYMENTS_TABLE_SQL.format(table="payments_new"))
+    created_at = EPOCH_FROM_LEGACY_SQL.format(column="created_at")
+    updated_at = EPOCH_FROM_LEGACY_SQL.format(column="updated_at")
+    await db.execute(
+        f"INSERT INTO payments_new ({PAYMENTS_COLUMNS}) "
+        "SELECT payment_id, amount, receiver, token_id, status, tx_hash, "
+        f"{created_at}, {updated_at} FROM payments"
+    )
+    await db.execute("DROP TABLE payments")
+    await db.execute("ALTER TABLE payments_new RENAME TO payments")
 
 
 async def create_payment(
-    payment_id: str, amount: float, receiver: str, token_id: str = "usdc"
+    db: aiosqlite.Connection,
+    payment_id: str,
+    amount: float,
+    receiver: str,
+    token_id: str = "usdc",
 ) -> None:
     """Create a new payment record.
 
     Args:
+        db: Open database connection.
         payment_id: Unique identifier for the payment.
         amount: Payment amount.
         receiver: Blockchain address to receive the payment.
         token_id: Token identifier (e.g. "usdc", "kii").
     """
-    async with aiosqlite.connect(settings.database_path) as db:
+    now = int(time.time())
+    async with write_transaction(db):
         await db.execute(
-            "INSERT INTO payments "
-            "(payment_id, amount, receiver, token_id, status) "
-            "VALUES (?, ?, ?, ?, ?)",
-            (payment_id, amount, receiver, token_id, "pending"),
+            INSERT_PAYMENT_SQL,
+            (payment_id, amount, receiver, token_id, "pending", now, now),
         )
-        await db.commit()
 
 
-async def get_payment(payment_id: str) -> dict | None:
+async def create_payments_bulk(
+    db: aiosqlite.Connection, payments: Iterable[tuple[str, float, str, str]]
+) -> None:
+    """Create many payment records in a single transaction.
+
+    Either every payment is inserted or, on any error, none are.
+
+    Args:
+        db: Open database connection.
+        payments: (payment_id, amount, receiver, token_id) for each payment.
+    """
+    now = int(time.time())
+    async with write_transaction(db):
+        await db.executemany(
+            INSERT_PAYMENT_SQL,
+            (
+                (payment_id, amount, receiver, token_id, "pending", now, now)
+                for payment_id, amount, receiver, token_id in payments
+            ),
+        )
+
+
+async def get_payment(
+    db: aiosqlite.Connection, payment_id: str
+) -> PaymentRecord | None:
     """Get payment details by payment ID.
 
     Args:
+        db: Open database connection.
         payment_id: Unique identifier for the payment.
 
     Returns:
-        Payment record as a dictionary, or None if not found.
+        Payment record, or None if not found.
     """
-    async with aiosqlite.connect(settings.database_path) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute(
-            "SELECT * FROM payments WHERE payment_id = ?", (payment_id,)
-        ) as cursor:
-            row = await cursor.fetchone()
-            if row:
-                return dict(row)
-            return None
+    async with db.execute(SELECT_PAYMENT_SQL, (payment_id,)) as cursor:
+        row = await cursor.fetchone()
+        if row:
+            return PaymentRecord(*row)
+        return None
 
 
-async def update_payment_status(
-    payment_id: str, status: str, tx_hash: str | None = None
-) -> None:
-    """Update payment status and optionally the transaction hash.
+async def get_payments(
+    db: aiosqlite.Connection, payment_ids: list[str]
+) -> list[PaymentRecord]:
+    """Get payment details for several payment IDs in one query.
 
     Args:
+        db: Open database connection.
+        payment_ids: Unique payment identifiers, at most MAX_BATCH_SIZE.
+
+    Returns:
+        Payment records, in no particular order. Unknown IDs are left out.
+    """
+    if not payment_ids:
+        return []
+    if len(payment_ids) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} payment IDs per batch")
+    sql = select_payments_sql(len(payment_ids))
+    async with db.execute(sql, payment_ids) as cursor:
+        return [PaymentRecord(*row) for row in await cursor.fetchall()]
+
+
+async def mark_payment_paid(
+    db: aiosqlite.Connection, payment_id: str, tx_hash: str | None
+) -> bool:
+    """Mark a pending payment as paid in a single statement.
+
+    Args:
+        db: Open database connection.
         payment_id: Unique identifier for the payment.
-        status: New status (pending, paid, failed).
-        tx_hash: Optional transaction hash from successful payment.
+        tx_hash: Transaction hash from the settled payment.
+
+    Returns:
+        True if the payment was pending and is now paid, False if it was not
+        found or was no longer pending.
     """
-    async with aiosqlite.connect(settings.database_path) as db:
-        if tx_hash:
-            await db.execute(
-                """
-                UPDATE payments
-                SET status = ?, tx_hash = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE payment_id = ?
-                """,
-                (status, tx_hash, payment_id),
-            )
-        else:
-            await db.execute(
-                """
-                UPDATE payments
-                SET status = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE payment_id = ?
-                """,
-                (status, payment_id),
-            )
-        await db.commit()
+    async with write_transaction(db):
+        params = (tx_hash, int(time.time()), payment_id)
+        async with db.execute(MARK_PAID_SQL, params) as cursor:
+            row = await cursor.fetchone()
+    return row is not None
@@ -1,21 +1,78 @@
 """Payment Link Service - A web app for creating x402-protected payment links."""
 
+import hashlib
+import logging
+import secrets
 import traceback
-import uuid
+import urllib.request
+from collections.abc import Callable
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, AsyncGenerator
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Generic, NamedTuple, TypeVar
 
+import httpx
+import orjson
 from fastapi import FastAPI, Query, Request, Response
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel, Field
 
 from config import get_available_tokens, get_token_by_id, settings
-from database import create_payment, get_payment, init_db, update_payment_status
+from database import (
+    MAX_BATCH_SIZE,
+    ConnectionPool,
+    PaymentRecord,
+    create_payment,
+    get_payment,
+    get_payments,
+    mark_payment_paid,
+)
+
+logger = logging.getLogger(__name__)
 
 # Static files directory
 STATIC_DIR = Path(__file__).parent / "static"
 
+# Settings and tokens are fixed for the process lifetime, so build /config once
+CONFIG_RESPONSE: dict[str, Any] = {
+    "network": settings.network,
+    "chainId": settings.chain_id,
+    "explorerUrl": settings.explorer_url,
+    "tokens": get_available_tokens(settings.network),
+}
+CONFIG_BODY: bytes = orjson.dumps(CONFIG_RESPONSE)
+
+# Let browsers reuse static payloads briefly and revalidate them with ETags
+CACHE_CONTROL = "public, max-age=60"
+
+
+def make_etag(body: bytes) -> str:
+    """Compute a strong ETag for a response body."""
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+CONFIG_ETAG = make_etag(CONFIG_BODY)
+
+
+def load_page(path: Path) -> tuple[bytes, str] | None:
+    """Read an HTML page into memory once at startup.
+
+    Args:
+        path: Path to the HTML file.
+
+    Returns:
+        The page body and its ETag, or None if the file does not exist.
+    """
+    if not path.exists():
+        return None
+    body = path.read_bytes()
+    return body, make_etag(body)
+
+
+# Pages are read into memory once instead of from disk per request
+INDEX_PAGE = load_page(STATIC_DIR / "index.html")
+CREATE_PAGE = load_page(STATIC_DIR / "create-payment-link.html")
+
 if TYPE_CHECKING:
     from x402_payment_service import PaymentService as PaymentServiceType
 
@@ -24,30 +81,352 @@ try:
 except ImportError:
     PaymentService = None  # type: ignore[misc, assignment]
 
+# Request headers read by PaymentService: the payment payload, plus what it uses
+# to choose between the HTML paywall and the JSON 402 response
+X402_HEADERS = ("x-payment", "accept", "user-agent")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson instead of the stdlib json module.
+
+    FastAPI ships an equivalent class but deprecates it in recent releases.
+    """
+
+    def render(self, content: Any) -> bytes:
+        """Serialize content to JSON bytes."""
+        return orjson.dumps(content)
+
+
+# The x402 library doesn't set a timeout for settle(), but blockchain
+# transactions can take longer than the default 5 seconds
+FACILITATOR_TIMEOUT_SECONDS = 60.0
+FACILITATOR_KEEPALIVE_CONNECTIONS = 32
+
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    """Forward requests to a shared connection pool that clients cannot close.
+
+    Timeouts shorter than FACILITATOR_TIMEOUT_SECONDS are raised to it, so only
+    facilitator requests wait longer than the client's own timeout.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        """Wrap the transport owned by the application lifespan."""
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send the request over the shared pool."""
+        if (timeout := request.extensions.get("timeout")) is not None:
+            request.extensions["timeout"] = {
+                name: None
+                if seconds is None
+                else max(seconds, FACILITATOR_TIMEOUT_SECONDS)
+                for name, seconds in timeout.items()
+            }
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Leave the shared pool open when a short-lived client closes."""
+
+
+def facilitator_origin(url: str) -> str:
+    """Reduce a URL to the scheme://host[:port] pattern httpx mounts match on."""
+    parsed = httpx.URL(url)
+    port = f":{parsed.port}" if parsed.port is not None else ""
+    return f"{parsed.scheme}://{parsed.host}{port}"
+
+
+def environment_proxy(url: str) -> str | None:
+    """Return the proxy that HTTPS_PROXY/ALL_PROXY/NO_PROXY select for a URL.
+
+    Args:
+        url: URL the proxy would be used for.
+
+    Returns:
+        Proxy URL, or None for a direct connection.
+    """
+    parsed = httpx.URL(url)
+    if urllib.request.proxy_bypass(parsed.host):
+        return None
+    proxies = urllib.request.getproxies()
+    return proxies.get(parsed.scheme) or proxies.get("all")
+
+
+# Clients passing any of these chose their own connection setup; leave them alone
+CLIENT_CONNECTION_OPTIONS = frozenset(
+    {
+        "transport",
+        "mounts",
+        "verify",
+        "cert",
+        "http1",
+        "http2",
+        "limits",
+        "proxy",
+        "trust_env",
+    }
+)
+
+
+def patch_httpx_clients(
+    facilitator_url: str, transport: httpx.AsyncBaseTransport
+) -> Callable[[], None]:
+    """Route new httpx.AsyncClients' facilitator requests over a shared transport.
+
+    x402_payment_service opens a fresh AsyncClient for each facilitator call, so
+    this is the only way to keep facilitator connections alive between payments.
+    The transport is mounted for the facilitator origin only, so requests to any
+    other host keep httpx's defaults, including timeouts and environment proxies.
+    Clients that configure their own transport, TLS or proxy options are not
+    modified.
+
+    Args:
+        facilitator_url: Facilitator URL whose origin uses the shared transport.
+        transport: Shared transport, configured with any proxy the origin needs.
+
+    Returns:
+        Function that restores the original AsyncClient constructor.
+    """
+    original_init = httpx.AsyncClient.__init__
+    mounts = {facilitator_origin(facilitator_url): SharedTransport(transport)}
+
+    def patched_init(self: httpx.AsyncClient, *args: Any, **kwargs: Any) -> None:
+        if CLIENT_CONNECTION_OPTIONS.isdisjoint(kwargs):
+            kwargs["mounts"] = mounts
+        original_init(self, *args, **kwargs)
+
+    def restore() -> None:
+        httpx.AsyncClient.__init__ = original_init  # type: ignore[method-assign]
+
+    httpx.AsyncClient.__init__ = patched_init  # type: ignore[method-assign]
+    return restore
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
-    """Initialize database on startup."""
-    await init_db()
-    yield
+    """Open shared database and facilitator connections for the app lifetime."""
+    db_pool = ConnectionPool(
+        settings.database_path, readers=settings.database_pool_size
+    )
+    facilitator_transport = httpx.AsyncHTTPTransport(
+        proxy=environment_proxy(settings.facilitator_url),
+        limits=httpx.Limits(
+            max_keepalive_connections=FACILITATOR_KEEPALIVE_CONNECTIONS
+        ),
+    )
+    app.state.db_pool = db_pool
+    app.state.facilitator_transport = facilitator_transport
+    restore_httpx_clients = patch_httpx_clients(
+        settings.facilitator_url, facilitator_transport
+    )
+    try:
+        await db_pool.open()
+        yield
+    finally:
+        restore_httpx_clients()
+        await facilitator_transport.aclose()
+        await db_pool.close()
 
 
 app = FastAPI(
     title=settings.app_name,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
 @app.exception_handler(Exception)
-async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
-    """Catch all unhandled exceptions and return a JSON error response."""
-    return JSONResponse(
+async def global_exception_handler(request: Request, exc: Exception) -> ORJSONResponse:
+    """Catch all unhandled exceptions and return a JSON error response.
+
+    Exception details and the traceback are only sent to the client in debug mode.
+    """
+    if settings.debug:
+        return ORJSONResponse(
+            status_code=500,
+            content={
+                "error": str(exc),
+                "type": type(exc).__name__,
+                "traceback": "".join(traceback.format_exception(exc)),
+            },
+        )
+    logger.error("Unhandled exception on %s", request.url.path, exc_info=exc)
+    return ORJSONResponse(
         status_code=500,
-        content={
-            "error": str(exc),
-            "type": type(exc).__name__,
-            "traceback": traceback.format_exc(),
-        },
+        content={"error": "Internal server error", "type": type(exc).__name__},
+    )
+
+
+def cached_response(
+    request: Request, body: bytes, media_type: str, etag: str
+) -> Response:
+    """Return a cacheable response, or 304 if the client already has this body.
+
+    Args:
+        request: FastAPI request object.
+        body: Precomputed response body.
+        media_type: Content type of the body.
+        etag: ETag of the body.
+
+    Returns:
+        Response with ETag and Cache-Control headers.
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match uses weak comparison, so W/"x" matches "x"; proxies
+        # that compress the body often weaken the ETag they pass on
+        client_etags = {
+            tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+        }
+        if etag in client_etags or "*" in client_etags:
+            return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class BoundedCache(Generic[K, V]):
+    """FIFO cache that evicts its oldest entries to stay under a total weight.
+
+    Every entry weighs 1 by default, which makes max_weight an entry count.
+    """
+
+    def __init__(
+        self, max_weight: int, weigh: Callable[[V], int] = lambda value: 1
+    ) -> None:
+        """Create an empty cache.
+
+        Args:
+            max_weight: Maximum total weight of the cached values.
+            weigh: Returns the weight of a value.
+        """
+        self.max_weight = max_weight
+        self.weight = 0
+        self._weigh = weigh
+        self._entries: dict[K, V] = {}
+
+    def get(self, key: K) -> V | None:
+        """Return the cached value for a key, if any."""
+        return self._entries.get(key)
+
+    def put(self, key: K, value: V) -> None:
+        """Store a value, evicting the oldest entries to stay under the cap.
+
+        Values heavier than the whole cache are not stored.
+        """
+        weight = self._weigh(value)
+        if weight > self.max_weight:
+            return
+        if (previous := self._entries.pop(key, None)) is not None:
+            self.weight -= self._weigh(previous)
+        while self._entries and self.weight + weight > self.max_weight:
+            oldest = self._entries.pop(next(iter(self._entries)))
+            self.weight -= self._weigh(oldest)
+        self._entries[key] = value
+        self.weight += weight
+
+
+# Paid is a terminal status, so responses for paid payments never change and
+# can be served from memory without touching the database
+PAID_CACHE_SIZE = 10_000
+
+
+class PaidResponses(NamedTuple):
+    """Serialized /pay and /status bodies for a paid payment."""
+
+    pay: bytes
+    status: bytes
+
+
+PAID_CACHE: BoundedCache[str, PaidResponses] = BoundedCache(PAID_CACHE_SIZE)
+
+
+def cache_paid_payment(payment_record: PaymentRecord) -> PaidResponses:
+    """Serialize and cache the responses for a paid payment.
+
+    Args:
+        payment_record: Payment record with status "paid".
+
+    Returns:
+        The cached response bodies.
+    """
+    paid = PaidResponses(
+        pay=orjson.dumps({"status": "paid", "tx": payment_record.tx_hash}),
+        status=orjson.dumps(payment_status(payment_record)),
+    )
+    PAID_CACHE.put(payment_record.payment_id, paid)
+    return paid
+
+
+# The 402 challenge for a request without X-Payment depends only on the payment
+# URL and whether the client looks like a browser, so it is rendered once per
+# combination instead of by a new PaymentService on every poll. Paywall pages
+# can be large, so the cache is bounded by total body size.
+X402_CHALLENGE_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+
+class X402Challenge(NamedTuple):
+    """Rendered 402 payment-required response."""
+
+    body: bytes
+    status_code: int
+    media_type: str | None
+
+
+X402_CHALLENGE_CACHE: BoundedCache[tuple[str, bool, bool], X402Challenge] = (
+    BoundedCache(X402_CHALLENGE_CACHE_MAX_BYTES, lambda challenge: len(challenge.body))
+)
+
+
+def x402_client_kind(accept: str, user_agent: str) -> tuple[bool, bool]:
+    """Reduce Accept and User-Agent to the inputs of x402's paywall check.
+
+    Mirrors the browser check x402_payment_service uses to choose between its
+    HTML paywall and the JSON 402 body. Clients that reduce to the same kind
+    must get the same challenge, which
+    test_x402_client_kind_matches_payment_service checks against the installed
+    package.
+
+    Args:
+        accept: Accept request header, or "".
+        user_agent: User-Agent request header, or "".
+
+    Returns:
+        Whether the client accepts HTML and whether it looks like a browser.
+    """
+    return "text/html" in accept, "Mozilla" in user_agent
+
+
+def x402_challenge_key(
+    payment_id: str, request: Request
+) -> tuple[str, bool, bool] | None:
+    """Build the challenge cache key for a request, if its challenge is cacheable.
+
+    Only requests for the exact payment URL handed out by /create-payment-link
+    are cached, so query strings and Host headers cannot multiply entries or
+    leak into the resource URL served to other clients. Behind a reverse proxy
+    the request URL only matches APP_BASE_URL if uvicorn trusts the proxy's
+    forwarded headers; otherwise every challenge is rendered per request.
+
+    Args:
+        payment_id: Unique payment identifier.
+        request: FastAPI request object.
+
+    Returns:
+        Cache key, or None if the challenge must be rendered for this request.
+    """
+    if "x-payment" in request.headers:
+        return None
+    if str(request.url) != f"{settings.app_base_url}/pay/{payment_id}":
+        return None
+    return (
+        payment_id,
+        *x402_client_kind(
+            request.headers.get("accept", ""), request.headers.get("user-agent", "")
+        ),
     )
 
 
@@ -57,12 +436,12 @@ if STATIC_DIR.exists():
 
 
 @app.get("/")
-async def root() -> Response:
+async def root(request: Request) -> Response:
     """Serve the index.html page."""
-    index_path = STATIC_DIR / "index.html"
-    if index_path.exists():
-        return FileResponse(index_path)
-    return JSONResponse(
+    if INDEX_PAGE is not None:
+        body, etag = INDEX_PAGE
+        return cached_response(request, body, "text/html", etag)
+    return ORJSONResponse(
         {
             "service": settings.app_name,
             "status": "running",
@@ -71,35 +450,33 @@ async def root() -> Response:
 
 
 @app.get("/create")
-async def create_page() -> Response:
+async def create_page(request: Request) -> Response:
     """Serve the create payment link page."""
-    create_path = STATIC_DIR / "create-payment-link.html"
-    if create_path.exists():
-        return FileResponse(create_path)
-    return JSONResponse(
+    if CREATE_PAGE is not None:
+        body, etag = CREATE_PAGE
+        return cached_response(request, body, "text/html", etag)
+    return ORJSONResponse(
         status_code=404,
         content={"error": "Page not found"},
     )
 
 
 @app.get("/config")
-async def get_config() -> dict[str, Any]:
+async def get_config(request: Request) -> Response:
     """Return client configuration for the frontend.
 
+    Args:
+        request: FastAPI request object.
+
     Returns:
         JSON with network, tokens list, and chain configuration.
     """
-    tokens = get_available_tokens(settings.network)
-    return {
-        "network": settings.network,
-        "chainId": settings.chain_id,
-        "explorerUrl": settings.explorer_url,
-        "tokens": tokens,
-    }
+    return cached_response(request, CONFIG_BODY, "application/json", CONFIG_ETAG)
 
 
 @app.get("/create-payment-link")
 async def create_payment_link(
+    request: Request,
     amount: float = Query(..., gt=0, description="Payment amount"),
     receiver: str = Query(..., description="Blockchain address to receive payment"),
     token: str = Query("usdc", description="Token ID (e.g. usdc, kii)"),
@@ -107,6 +484,7 @@ async def create_payment_link(
     """Create a new payment link with a unique ID.
 
     Args:
+        request: FastAPI request object.
         amount: Payment amount (must be greater than 0).
         receiver: Blockchain address to receive the payment.
         token: Token identifier to use for payment.
@@ -117,7 +495,7 @@ async def create_payment_link(
     # Validate token exists on current network
     token_info = get_token_by_id(token, settings.network)
     if not token_info:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=400,
             content={
                 "error": (
@@ -126,11 +504,12 @@ async def create_payment_link(
             },
         )
 
-    payment_id = str(uuid.uuid4())
-    await create_payment(payment_id, amount, receiver, token_id=token)
+    payment_id = secrets.token_hex(16)
+    async with request.app.state.db_pool.writer() as db:
+        await create_payment(db, payment_id, amount, receiver, token_id=token)
 
     payment_url = f"{settings.app_base_url}/pay/{payment_id}"
-    return JSONResponse(
+    return ORJSONResponse(
         content={
             "payment_id": payment_id,
             "payment_url": payment_url,
@@ -149,7 +528,7 @@ def create_x402_response(payment_service: "PaymentServiceType", error: str) -> R
         error: Error message to include.
 
     Returns:
-        Either HTMLResponse (for browser) or JSONResponse (for API).
+        Either HTMLResponse (for browser) or ORJSONResponse (for API).
     """
     content, status_code = payment_service.response(error)
 
@@ -157,7 +536,7 @@ def create_x402_response(payment_service: "PaymentServiceType", error: str) -> R
     if isinstance(content, str):
         return HTMLResponse(content=content, status_code=status_code)
     else:
-        return JSONResponse(content=content, status_code=status_code)
+        return ORJSONResponse(content=content, status_code=status_code)
 
 
 @app.get("/pay/{payment_id}")
@@ -174,27 +553,27 @@ async def pay(payment_id: str, request: Request) -> Response:
     Returns:
         JSON response with payment status or 402 payment required.
     """
+    if (paid := PAID_CACHE.get(payment_id)) is not None:
+        return Response(content=paid.pay, media_type="application/json")
+
     # Get payment from database
-    payment_record = await get_payment(payment_id)
+    async with request.app.state.db_pool.acquire() as db:
+        payment_record = await get_payment(db, payment_id)
 
     if not payment_record:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=404,
             content={"error": "Payment not found"},
         )
 
     # If already paid, return the transaction details
-    if payment_record["status"] == "paid":
-        return JSONResponse(
-            content={
-                "status": "paid",
-                "tx": payment_record["tx_hash"],
-            }
-        )
+    if payment_record.status == "paid":
+        paid = cache_paid_payment(payment_record)
+        return Response(content=paid.pay, media_type="application/json")
 
     # Check if x402 is available
     if PaymentService is None:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "error": (
@@ -205,11 +584,25 @@ async def pay(payment_id: str, request: Request) -> Response:
             },
         )
 
+    challenge_key = x402_challenge_key(payment_id, request)
+    if challenge_key is not None and (
+        (challenge := X402_CHALLENGE_CACHE.get(challenge_key)) is not None
+    ):
+        return Response(
+            content=challenge.body,
+            status_code=challenge.status_code,
+            media_type=challenge.media_type,
+        )
+
     # Create payment service for x402 verification
-    headers_dict = dict(request.headers)
+    headers_dict = {
+        name: value
+        for name in X402_HEADERS
+        if (value := request.headers.get(name)) is not None
+    }
 
     # Normalize header case - x402 library expects 'X-Payment' not 'x-payment'
-    if "x-payment" in headers_dict and "X-Payment" not in headers_dict:
+    if "x-payment" in headers_dict:
         headers_dict["X-Payment"] = headers_dict["x-payment"]
 
     try:
@@ -218,16 +611,16 @@ async def pay(payment_id: str, request: Request) -> Response:
             app_logo=settings.app_logo,
             headers=headers_dict,
             resource_url=str(request.url),
-            price=payment_record["amount"],
+            price=payment_record.amount,
             description=f"Payment for order {payment_id}",
             network=settings.network,
-            pay_to_address=payment_record["receiver"],
+            pay_to_address=payment_record.receiver,
             facilitator_url=settings.facilitator_url,
             max_timeout_seconds=settings.max_timeout_seconds,
-            eip3009_token=payment_record["token_id"],
+            eip3009_token=payment_record.token_id,
         )
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Failed to initialize payment service: {e}"},
         )
@@ -236,13 +629,21 @@ async def pay(payment_id: str, request: Request) -> Response:
     try:
         success, payment, selected_requirements, parse_error = payment_service.parse()
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Failed to parse payment: {e}"},
         )
 
     if not success or parse_error is not None:
-        return create_x402_response(payment_service, parse_error or "Payment required")
+        response = create_x402_response(
+            payment_service, parse_error or "Payment required"
+        )
+        if challenge_key is not None:
+            challenge = X402Challenge(
+                bytes(response.body), response.status_code, response.media_type
+            )
+            X402_CHALLENGE_CACHE.put(challenge_key, challenge)
+        return response
 
     # Type narrowing: after success check, these should not be None
     if payment is None or selected_requirements is None:
@@ -254,7 +655,7 @@ async def pay(payment_id: str, request: Request) -> Response:
             payment, selected_requirements, payment_id
         )
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Failed to verify payment: {e}"},
         )
@@ -265,19 +666,6 @@ async def pay(payment_id: str, request: Request) -> Response:
         )
 
     # Step 3: Settle payment
-    # Patch httpx timeout - the x402 library doesn't set a timeout for settle(),
-    # but blockchain transactions can take longer than the default 5 seconds
-    import httpx
-
-    original_init = httpx.AsyncClient.__init__
-
-    def patched_init(self: httpx.AsyncClient, *args: object, **kwargs: object) -> None:
-        if "timeout" not in kwargs:
-            kwargs["timeout"] = 60.0  # 60 seconds for blockchain transactions
-        original_init(self, *args, **kwargs)
-
-    httpx.AsyncClient.__init__ = patched_init  # type: ignore[method-assign]
-
     try:
         (
             settle_success,
@@ -286,12 +674,10 @@ async def pay(payment_id: str, request: Request) -> Response:
             settle_error,
         ) = await payment_service.settle(payment, selected_requirements, payment_id)
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Failed to settle payment: {e}"},
         )
-    finally:
-        httpx.AsyncClient.__init__ = original_init  # type: ignore[method-assign]
 
     if not settle_success:
         return create_x402_response(
@@ -299,9 +685,14 @@ async def pay(payment_id: str, request: Request) -> Response:
         )
 
     # Payment successful - update database
-    await update_payment_status(payment_id, "paid", tx_hash)
+    async with request.app.state.db_pool.writer() as db:
+        marked_paid = await mark_payment_paid(db, payment_id, tx_hash)
+    if marked_paid:
+        cache_paid_payment(payment_record._replace(status="paid", tx_hash=tx_hash))
+    else:
+        logger.warning("Payment %s settled but was no longer pending", payment_id)
 
-    return JSONResponse(
+    return ORJSONResponse(
         content={
             "status": "paid",
             "tx": tx_hash,
@@ -310,30 +701,86 @@ async def pay(payment_id: str, request: Request) -> Response:
 
 
 @app.get("/status/{payment_id}")
-async def get_payment_status(payment_id: str) -> JSONResponse:
+async def get_payment_status(payment_id: str, request: Request) -> Response:
     """Get the current status of a payment.
 
     Args:
         payment_id: Unique payment identifier.
+        request: FastAPI request object.
 
     Returns:
         JSON with payment status details.
     """
-    payment_record = await get_payment(payment_id)
+    if (paid := PAID_CACHE.get(payment_id)) is not None:
+        return Response(content=paid.status, media_type="application/json")
+
+    async with request.app.state.db_pool.acquire() as db:
+        payment_record = await get_payment(db, payment_id)
 
     if not payment_record:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=404,
             content={"error": "Payment not found"},
         )
 
-    is_paid = payment_record["status"] == "paid"
-    return JSONResponse(
+    if payment_record.status == "paid":
+        paid = cache_paid_payment(payment_record)
+        return Response(content=paid.status, media_type="application/json")
+
+    return ORJSONResponse(content=payment_status(payment_record))
+
+
+def payment_status(payment_record: PaymentRecord) -> dict[str, Any]:
+    """Build the public status view of a payment record.
+
+    Args:
+        payment_record: Payment record from the database.
+
+    Returns:
+        Dictionary with payment_id, amount, paid flag and transaction hash.
+    """
+    return {
+        "payment_id": payment_record.payment_id,
+        "amount": payment_record.amount,
+        "paid": payment_record.status == "paid",
+        "tx": payment_record.tx_hash,
+    }
+
+
+class StatusBatchRequest(BaseModel):
+    """Request body for looking up several payments at once."""
+
+    ids: list[str] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+@app.post("/status-batch")
+async def get_payment_status_batch(
+    batch: StatusBatchRequest, request: Request
+) -> ORJSONResponse:
+    """Get the current status of several payments in one request.
+
+    Args:
+        batch: Payment IDs to look up.
+        request: FastAPI request object.
+
+    Returns:
+        JSON with the status of each known payment and the IDs not found.
+    """
+    payment_ids = list(dict.fromkeys(batch.ids))
+    async with request.app.state.db_pool.acquire() as db:
+        payment_records = await get_payments(db, payment_ids)
+
+    by_id = {record.payment_id: record for record in payment_records}
+    return ORJSONResponse(
         content={
-            "payment_id": payment_id,
-            "amount": payment_record["amount"],
-            "paid": is_paid,
-            "tx": payment_record["tx_hash"],
+            "payments": [
+                payment_status(by_id[payment_id])
+                for payment_id in payment_ids
+                if payment_id in by_id
+            ],
+            "not_found": [
+                payment_id for payment_id in payment_ids if payment_id not in by_id
+            ],
         }
     )
 
@@ -341,9 +788,21 @@ async def get_payment_status(payment_id: str) -> JSONResponse:
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(
-        "main:app",
-        host=settings.app_host,
-        port=settings.app_port,
-        reload=True,
-    )
+    if settings.debug:
+        uvicorn.run(
+            "main:app",
+            host=settings.app_host,
+            port=settings.app_port,
+            reload=True,
+        )
+    else:
+        uvicorn.run(
+            "main:app",
+            host=settings.app_host,
+            port=settings.app_port,
+            loop="uvloop",
+            http="httptools",
+            workers=settings.app_workers,
+            log_level="warning",
+            access_log=False,
+        )
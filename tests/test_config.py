@@ -0,0 +1,26 @@
+"""Tests for configuration loading."""
+
+import pytest
+
+import config
+
+
+def test_load_env_file_skipped_in_production(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test .env is parsed outside production and skipped when APP_ENV=production."""
+    calls: list[None] = []
+
+    def fake_load_dotenv() -> bool:
+        calls.append(None)
+        return True
+
+    monkeypatch.setattr(config, "load_dotenv", fake_load_dotenv)
+
+    monkeypatch.setenv("APP_ENV", "production")
+    assert config.load_env_file() is False
+    assert calls == []
+
+    monkeypatch.setenv("APP_ENV", "development")
+    assert config.load_env_file() is True
+    monkeypatch.delenv("APP_ENV")
+    assert config.load_env_file() is True
+    assert len(calls) == 2
@@ -0,0 +1,209 @@
+"""Tests for the database module."""
+
+import asyncio
+import sqlite3
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+
+from database import (
+    ConnectionPool,
+    create_payment,
+    create_payments_bulk,
+    get_payment,
+    get_payments,
+    mark_payment_paid,
+)
+
+TEST_RECEIVER = "0x1234567890abcdef1234567890abcdef12345678"
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    """Run async tests on asyncio only."""
+    return "asyncio"
+
+
+@pytest.fixture
+async def pool(tmp_path: Path) -> AsyncGenerator[ConnectionPool, None]:
+    """Create an open connection pool backed by a temporary database."""
+    db_pool = ConnectionPool(str(tmp_path / "payments.db"), readers=2)
+    await db_pool.open()
+    yield db_pool
+    await db_pool.close()
+
+
+@pytest.mark.anyio
+async def test_reader_sees_committed_write(pool: ConnectionPool) -> None:
+    """Test a payment written through the writer is visible to readers."""
+    async with pool.writer() as db:
+        await create_payment(db, "pool-1", 1.5, TEST_RECEIVER)
+
+    async with pool.acquire() as db:
+        record = await get_payment(db, "pool-1")
+    assert record is not None
+    assert record.amount == 1.5
+    assert record.status == "pending"
+
+
+@pytest.mark.anyio
+async def test_reader_rejects_writes(pool: ConnectionPool) -> None:
+    """Test pooled read-only connections cannot modify the database."""
+    async with pool.acquire() as db:
+        with pytest.raises(sqlite3.OperationalError):
+            await create_payment(db, "pool-2", 1.0, TEST_RECEIVER)
+
+
+def test_pool_requires_a_reader(tmp_path: Path) -> None:
+    """Test a pool without read connections is rejected instead of hanging."""
+    with pytest.raises(ValueError):
+        ConnectionPool(str(tmp_path / "payments.db"), readers=0)
+
+
+@pytest.mark.anyio
+async def test_pool_uses_wal_journal(pool: ConnectionPool) -> None:
+    """Test opening the pool switches the database to WAL mode."""
+    async with pool.acquire() as db:
+        cursor = await db.execute("PRAGMA journal_mode")
+        row = await cursor.fetchone()
+    assert row is not None
+    assert row[0] == "wal"
+
+
+def create_legacy_db(tmp_path: Path) -> str:
+    """Create a database with the original rowid schema and one payment."""
+    db_path = str(tmp_path / "legacy.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE payments (
+                payment_id TEXT PRIMARY KEY,
+                amount REAL NOT NULL,
+                receiver TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                tx_hash TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.execute(
+            "INSERT INTO payments (payment_id, amount, receiver) VALUES (?, ?, ?)",
+            ("legacy-1", 2.5, TEST_RECEIVER),
+        )
+    conn.close()
+    return db_path
+
+
+@pytest.mark.anyio
+async def test_init_db_migrates_legacy_table(tmp_path: Path) -> None:
+    """Test a legacy table is rebuilt with its rows and timestamps converted."""
+    db_path = create_legacy_db(tmp_path)
+
+    db_pool = ConnectionPool(db_path, readers=1)
+    await db_pool.open()
+    try:
+        async with db_pool.acquire() as db:
+            cursor = await db.execute(
+                "SELECT sql FROM sqlite_master WHERE name = 'payments'"
+            )
+            row = await cursor.fetchone()
+            record = await get_payment(db, "legacy-1")
+            cursor = await db.execute(
+                "SELECT created_at, updated_at FROM payments "
+                "WHERE payment_id = 'legacy-1'"
+            )
+            timestamps = await cursor.fetchone()
+    finally:
+        await db_pool.close()
+    assert row is not None
+    assert "WITHOUT ROWID" in row[0]
+    assert timestamps is not None
+    assert all(isinstance(value, int) and value > 0 for value in timestamps)
+    assert record is not None
+    assert record.amount == 2.5
+    assert record.token_id == "usdc"
+
+
+@pytest.mark.anyio
+async def test_mark_payment_paid_only_once(pool: ConnectionPool) -> None:
+    """Test only a pending payment transitions to paid."""
+    async with pool.writer() as db:
+        await create_payment(db, "paid-1", 1.0, TEST_RECEIVER)
+        assert await mark_payment_paid(db, "paid-1", "0xfirst") is True
+        assert await mark_payment_paid(db, "paid-1", "0xsecond") is False
+        assert await mark_payment_paid(db, "missing", "0xthird") is False
+
+    async with pool.acquire() as db:
+        record = await get_payment(db, "paid-1")
+    assert record is not None
+    assert record.status == "paid"
+    assert record.tx_hash == "0xfirst"
+
+
+@pytest.mark.anyio
+async def test_create_payments_bulk(pool: ConnectionPool) -> None:
+    """Test bulk creation inserts every payment in one transaction."""
+    payments = [(f"bulk-{i}", float(i), TEST_RECEIVER, "usdc") for i in range(1, 4)]
+    async with pool.writer() as db:
+        await create_payments_bulk(db, payments)
+
+    async with pool.acquire() as db:
+        records = await get_payments(db, [payment[0] for payment in payments])
+    assert sorted(record.amount for record in records) == [1.0, 2.0, 3.0]
+
+
+@pytest.mark.anyio
+async def test_create_payments_bulk_is_atomic(pool: ConnectionPool) -> None:
+    """Test a failing bulk insert leaves no partial rows behind."""
+    payments = [
+        ("atomic-1", 1.0, TEST_RECEIVER, "usdc"),
+        ("atomic-1", 2.0, TEST_RECEIVER, "usdc"),
+    ]
+    async with pool.writer() as db:
+        with pytest.raises(sqlite3.IntegrityError):
+            await create_payments_bulk(db, payments)
+        # The writer is usable again after the rollback
+        await create_payment(db, "atomic-2", 3.0, TEST_RECEIVER)
+
+    async with pool.acquire() as db:
+        assert await get_payment(db, "atomic-1") is None
+        assert await get_payment(db, "atomic-2") is not None
+
+
+@pytest.mark.anyio
+async def test_cancelled_write_releases_transaction(pool: ConnectionPool) -> None:
+    """Test cancelling a write mid-transaction leaves the writer usable."""
+
+    async def write() -> None:
+        async with pool.writer() as db:
+            await create_payment(db, "cancel-1", 1.0, TEST_RECEIVER)
+
+    task = asyncio.create_task(write())
+    # Let the task send BEGIN IMMEDIATE to the connection thread, then cancel it
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    async with pool.writer() as db:
+        await create_payment(db, "cancel-2", 2.0, TEST_RECEIVER)
+        assert not db.in_transaction
+    async with pool.acquire() as db:
+        assert await get_payment(db, "cancel-2") is not None
+
+
+@pytest.mark.anyio
+async def test_concurrent_init_db_migrates_once(tmp_path: Path) -> None:
+    """Test workers starting together against a legacy database all come up."""
+    db_path = create_legacy_db(tmp_path)
+    pools = [ConnectionPool(db_path, readers=1) for _ in range(4)]
+    try:
+        await asyncio.gather(*(db_pool.open() for db_pool in pools))
+        async with pools[0].acquire() as db:
+            cursor = await db.execute("SELECT COUNT(*) FROM payments")
+            row = await cursor.fetchone()
+    finally:
+        for db_pool in pools:
+            await db_pool.close()
+    assert row is not None
+    assert row[0] == 1
@@ -1,32 +1,46 @@
 """Tests for the payment link service."""
 
+import asyncio
 import os
+import sqlite3
 from collections.abc import Generator
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 
-from database import init_db
-from main import app
+from config import settings
+from main import (
+    FACILITATOR_TIMEOUT_SECONDS,
+    BoundedCache,
+    X402Challenge,
+    app,
+    environment_proxy,
+    patch_httpx_clients,
+    x402_client_kind,
+)
 
+FACILITATOR_URL = "https://facilitator.test"
 
-@pytest.fixture
-def client() -> Generator[TestClient, None, None]:
-    """Create a test client for the FastAPI app with initialized database."""
-    import asyncio
 
-    # Initialize database using asyncio.run for Python 3.10+
-    asyncio.run(init_db())
-
-    with TestClient(app) as test_client:
-        yield test_client
+@pytest.fixture
+def test_database() -> Generator[None, None, None]:
+    """Remove the test database created by the app lifespan."""
+    yield
 
-    # Clean up test database
     db_path = os.environ.get("DATABASE_PATH")
     if db_path and os.path.exists(db_path):
         os.remove(db_path)
 
 
+@pytest.fixture
+def client(test_database: None) -> Generator[TestClient, None, None]:
+    """Create a test client for the FastAPI app with initialized database."""
+    # Entering the client runs the lifespan, which opens and initializes the db
+    with TestClient(app) as test_client:
+        yield test_client
+
+
 def test_root_endpoint(client: TestClient) -> None:
     """Test the root endpoint returns the index.html page."""
     response = client.get("/")
@@ -36,6 +50,33 @@ def test_root_endpoint(client: TestClient) -> None:
     assert "Payment Link Service" in response.text
 
 
+def test_root_endpoint_revalidates_with_etag(client: TestClient) -> None:
+    """Test the index page returns 304 when the client's ETag matches."""
+    response = client.get("/")
+    etag = response.headers["etag"]
+    assert "max-age" in response.headers["cache-control"]
+
+    cached = client.get("/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+def test_root_endpoint_revalidates_with_weak_etag(client: TestClient) -> None:
+    """Test a weak ETag in If-None-Match still matches the page's ETag."""
+    etag = client.get("/").headers["etag"]
+
+    cached = client.get("/", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert cached.status_code == 304
+
+
+def test_create_page(client: TestClient) -> None:
+    """Test the create page is served as HTML."""
+    response = client.get("/create")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/html")
+    assert "etag" in response.headers
+
+
 def test_config_endpoint(client: TestClient) -> None:
     """Test the config endpoint returns tokens and chain configuration."""
     response = client.get("/config")
@@ -59,6 +100,9 @@ def test_config_endpoint(client: TestClient) -> None:
     assert isinstance(token["decimals"], int)
     assert isinstance(data["chainId"], int)
 
+    cached = client.get("/config", headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+
 
 TEST_RECEIVER = "0x1234567890abcdef1234567890abcdef12345678"
 
@@ -127,6 +171,22 @@ def test_status_nonexistent_payment(client: TestClient) -> None:
     assert response.status_code == 404
 
 
+def test_unhandled_error_hides_details(
+    test_database: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test unhandled errors return a generic 500 without leaking internals."""
+
+    async def failing_get_payment(*args: object) -> None:
+        raise RuntimeError("secret internals")
+
+    monkeypatch.setattr("main.get_payment", failing_get_payment)
+    with TestClient(app, raise_server_exceptions=False) as error_client:
+        response = error_client.get("/status/any-id")
+    assert response.status_code == 500
+    data = response.json()
+    assert data == {"error": "Internal server error", "type": "RuntimeError"}
+
+
 def test_payment_flow_without_x402_header(client: TestClient) -> None:
     """Test the payment flow without x402 header returns 402."""
     # Create a payment link
@@ -159,3 +219,277 @@ def test_status_after_create(client: TestClient) -> None:
     assert data["amount"] == 5.0
     assert data["paid"] is False
     assert data["tx"] is None
+
+
+def test_status_batch(client: TestClient) -> None:
+    """Test looking up several payments at once, including an unknown ID."""
+    payment_ids = [
+        client.get(
+            f"/create-payment-link?amount={amount}&receiver={TEST_RECEIVER}"
+        ).json()["payment_id"]
+        for amount in (1.0, 2.0)
+    ]
+
+    response = client.post(
+        "/status-batch", json={"ids": [*payment_ids, "nonexistent-id"]}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [p["payment_id"] for p in data["payments"]] == payment_ids
+    assert [p["amount"] for p in data["payments"]] == [1.0, 2.0]
+    assert all(p["paid"] is False for p in data["payments"])
+    assert data["not_found"] == ["nonexistent-id"]
+
+
+def test_status_batch_rejects_empty_ids(client: TestClient) -> None:
+    """Test an empty batch is rejected as a validation error."""
+    response = client.post("/status-batch", json={"ids": []})
+    assert response.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_patched_httpx_clients_share_transport() -> None:
+    """Test short-lived AsyncClients reuse one facilitator transport until restored."""
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200)
+
+    restore = patch_httpx_clients(FACILITATOR_URL, httpx.MockTransport(handler))
+    try:
+        for timeout in (None, 120.0):
+            client_options = {} if timeout is None else {"timeout": timeout}
+            async with httpx.AsyncClient(**client_options) as facilitator_client:
+                await facilitator_client.get(f"{FACILITATOR_URL}/verify")
+        default_client = httpx.AsyncClient()
+    finally:
+        restore()
+    # Only facilitator requests get the longer timeout; short ones are raised
+    assert [request.extensions["timeout"]["read"] for request in requests] == [
+        FACILITATOR_TIMEOUT_SECONDS,
+        120.0,
+    ]
+    assert default_client.timeout.read == httpx.AsyncClient().timeout.read
+
+
+@pytest.mark.anyio
+async def test_patched_httpx_clients_keep_environment_proxies(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test proxy env vars still apply to other hosts and to self-configured clients."""
+    proxied: list[bytes] = []
+
+    async def proxy(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        head = await reader.readuntil(b"\r\n\r\n")
+        request_line = head.split(b"\r\n", 1)[0]
+        proxied.append(request_line)
+        # Refuse tunnels, so HTTPS requests stop at the proxy
+        status = b"403 Forbidden" if request_line.startswith(b"CONNECT") else b"200 OK"
+        writer.write(b"HTTP/1.1 " + status + b"\r\nContent-Length: 0\r\n\r\n")
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(proxy, "127.0.0.1", 0)
+    proxy_url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    for name in ("HTTP_PROXY", "HTTPS_PROXY"):
+        monkeypatch.setenv(name, proxy_url)
+        monkeypatch.delenv(name.lower(), raising=False)
+    for name in ("ALL_PROXY", "all_proxy", "NO_PROXY", "no_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    assert environment_proxy(FACILITATOR_URL) == proxy_url
+
+    facilitator_requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        facilitator_requests.append(request)
+        return httpx.Response(200)
+
+    restore = patch_httpx_clients(FACILITATOR_URL, httpx.MockTransport(handler))
+    try:
+        async with httpx.AsyncClient() as patched:
+            await patched.get(f"{FACILITATOR_URL}/settle")
+            assert (await patched.get("http://other.test/")).status_code == 200
+        async with httpx.AsyncClient(verify=False) as own_tls:
+            with pytest.raises(httpx.ProxyError):
+                await own_tls.get(f"{FACILITATOR_URL}/settle")
+    finally:
+        restore()
+        server.close()
+        await server.wait_closed()
+
+    assert [request.url.path for request in facilitator_requests] == ["/settle"]
+    assert proxied == [
+        b"GET http://other.test/ HTTP/1.1",
+        b"CONNECT facilitator.test:443 HTTP/1.1",
+    ]
+
+
+def test_environment_proxy_respects_no_proxy(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test NO_PROXY hosts are reached directly."""
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.test:3128")
+    monkeypatch.setenv("NO_PROXY", "facilitator.test")
+    assert environment_proxy(FACILITATOR_URL) is None
+
+
+def set_payment_paid(payment_id: str, tx_hash: str) -> None:
+    """Mark a payment as paid directly in the test database."""
+    with sqlite3.connect(os.environ["DATABASE_PATH"]) as conn:
+        conn.execute(
+            "UPDATE payments SET status = 'paid', tx_hash = ? WHERE payment_id = ?",
+            (tx_hash, payment_id),
+        )
+    conn.close()
+
+
+def test_paid_payment_served_from_cache(client: TestClient) -> None:
+    """Test paid payments keep returning their first-seen paid response."""
+    create_response = client.get(
+        f"/create-payment-link?amount=3.00&receiver={TEST_RECEIVER}"
+    )
+    payment_id = create_response.json()["payment_id"]
+    set_payment_paid(payment_id, "0xabc")
+
+    status_response = client.get(f"/status/{payment_id}")
+    assert status_response.status_code == 200
+    assert status_response.json() == {
+        "payment_id": payment_id,
+        "amount": 3.0,
+        "paid": True,
+        "tx": "0xabc",
+    }
+
+    # Later reads come from the cache, not the database
+    set_payment_paid(payment_id, "0xchanged")
+    assert client.get(f"/status/{payment_id}").json()["tx"] == "0xabc"
+    pay_response = client.get(f"/pay/{payment_id}")
+    assert pay_response.status_code == 200
+    assert pay_response.json() == {"status": "paid", "tx": "0xabc"}
+
+
+class FakePaymentService:
+    """Stand-in for x402_payment_service.PaymentService without a facilitator."""
+
+    instances = 0
+
+    def __init__(self, **kwargs: object) -> None:
+        FakePaymentService.instances += 1
+
+    def parse(self) -> tuple[bool, None, None, str]:
+        return False, None, None, "No X-PAYMENT header provided"
+
+    def response(self, error: str) -> tuple[dict[str, object], int]:
+        return {"x402Version": 1, "accepts": [], "error": error}, 402
+
+
+def create_unpaid_payment_url(client: TestClient) -> str:
+    """Create a payment link and return its canonical payment URL."""
+    create_response = client.get(
+        f"/create-payment-link?amount=0.02&receiver={TEST_RECEIVER}"
+    )
+    return create_response.json()["payment_url"]
+
+
+def test_x402_challenge_rendered_once(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test repeated unpaid requests reuse the rendered 402 response."""
+    monkeypatch.setattr("main.PaymentService", FakePaymentService)
+    monkeypatch.setattr(FakePaymentService, "instances", 0)
+    payment_url = create_unpaid_payment_url(client)
+
+    first = client.get(payment_url)
+    second = client.get(payment_url, headers={"User-Agent": "curl/8.0"})
+    assert first.status_code == second.status_code == 402
+    assert first.json() == second.json()
+    assert second.json()["error"] == "No X-PAYMENT header provided"
+    assert FakePaymentService.instances == 1
+
+
+def test_x402_challenge_not_cached_for_other_urls(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test query strings and foreign Host headers bypass the challenge cache."""
+    monkeypatch.setattr("main.PaymentService", FakePaymentService)
+    monkeypatch.setattr(FakePaymentService, "instances", 0)
+    payment_url = create_unpaid_payment_url(client)
+    payment_path = httpx.URL(payment_url).path
+
+    for query in ("a=1", "a=2"):
+        assert client.get(f"{payment_url}?{query}").status_code == 402
+    assert client.get(f"http://evil.test{payment_path}").status_code == 402
+    assert FakePaymentService.instances == 3
+
+
+def test_challenge_cache_bounded_by_bytes() -> None:
+    """Test the challenge cache evicts the oldest bodies to stay under its cap."""
+    cache: BoundedCache[str, X402Challenge] = BoundedCache(
+        10, lambda challenge: len(challenge.body)
+    )
+    for payment_id in ("a", "b", "c"):
+        cache.put(payment_id, X402Challenge(b"x" * 4, 402, None))
+    cache.put("huge", X402Challenge(b"x" * 11, 402, None))
+
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    assert cache.get("c") is not None
+    assert cache.get("huge") is None
+    assert cache.weight == 8
+
+
+def test_bounded_cache_counts_entries_by_default() -> None:
+    """Test an unweighted cache keeps at most max_weight entries."""
+    cache: BoundedCache[str, int] = BoundedCache(2)
+    for value, key in enumerate(("a", "b", "a", "c")):
+        cache.put(key, value)
+
+    assert cache.get("a") == 2
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+ACCEPT_HEADERS = (
+    "",
+    "*/*",
+    "application/json",
+    "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+)
+USER_AGENTS = (
+    "",
+    "curl/8.0",
+    "python-httpx/0.28.1",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/120.0 Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) Mobile/15E148",
+)
+
+
+def test_x402_client_kind_matches_payment_service() -> None:
+    """Test clients the challenge cache treats alike get the same x402 response."""
+    x402_payment_service = pytest.importorskip("x402_payment_service")
+    challenges: dict[tuple[bool, bool], object] = {}
+    for accept in ACCEPT_HEADERS:
+        for user_agent in USER_AGENTS:
+            headers = {
+                name: value
+                for name, value in (("accept", accept), ("user-agent", user_agent))
+                if value
+            }
+            payment_service = x402_payment_service.PaymentService(
+                app_name=settings.app_name,
+                app_logo=settings.app_logo,
+                headers=headers,
+                resource_url=f"{settings.app_base_url}/pay/kind-test",
+                price=0.01,
+                description="Payment for order kind-test",
+                network=settings.network,
+                pay_to_address=TEST_RECEIVER,
+                facilitator_url=settings.facilitator_url,
+                max_timeout_seconds=settings.max_timeout_seconds,
+                eip3009_token="usdc",
+            )
+            content, _ = payment_service.response("Payment required")
+            kind = x402_client_kind(accept, user_agent)
+            assert challenges.setdefault(kind, content) == content, headers
+
+    assert isinstance(challenges[(True, True)], str)
+    assert not isinstance(challenges[(False, False)], str)